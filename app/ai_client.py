@@ -2,11 +2,23 @@
 
 from __future__ import annotations
 
-import importlib
-import json
+import copy
+import os
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Callable, Dict, List, Optional
 
+import json_codec
+
+try:
+    import yaml
+except ImportError:  # reported when a template is actually loaded
+    yaml = None
+    _YamlLoader = None
+else:
+    # libyaml's C loader when PyYAML was built with it, else the pure-Python one.
+    _YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 REQUIRED_TOP_LEVEL_FIELDS = {"title", "description", "specs", "equipment", "avito_fields"}
 REQUIRED_EQUIPMENT_SECTIONS = {
@@ -19,7 +31,13 @@ REQUIRED_EQUIPMENT_SECTIONS = {
     "safety",
     "multimedia",
 }
+# Stable iteration order so per-section errors come out the same on every run.
+_EQUIPMENT_SECTION_ORDER = tuple(sorted(REQUIRED_EQUIPMENT_SECTIONS))
 TRANSMISSION_ALLOWED = {"MT", "AT", "CVT", "AMT"}
+TEMPLATE_CACHE_SIZE = 100
+
+# Parsed templates keyed by absolute path: (st_mtime, st_size, template).
+_TEMPLATE_CACHE: "OrderedDict[str, tuple[float, int, Dict]]" = OrderedDict()
 
 
 @dataclass(frozen=True)
@@ -30,20 +48,35 @@ class AIClientResult:
 
 
 def _load_template(template_id: str, templates_dir: str) -> Dict:
-    if importlib.util.find_spec("yaml") is None:
+    if yaml is None:
         raise RuntimeError(
             "PyYAML is required to load templates. Install with `pip install pyyaml`."
         )
 
-    yaml = importlib.import_module("yaml")
-
     template_path = f"{templates_dir.rstrip('/')}/{template_id}.yaml"
+    cache_key = os.path.abspath(template_path)
+    try:
+        stat = os.stat(cache_key)
+    except FileNotFoundError as exc:
+        raise RuntimeError(f"Template not found: {template_path}") from exc
+
+    cached = _TEMPLATE_CACHE.get(cache_key)
+    if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+        _TEMPLATE_CACHE.move_to_end(cache_key)
+        return copy.deepcopy(cached[2])
+
     try:
-        with open(template_path, "r", encoding="utf-8") as handle:
-            return yaml.safe_load(handle) or {}
+        with open(cache_key, "r", encoding="utf-8") as handle:
+            template = yaml.load(handle, Loader=_YamlLoader) or {}
     except FileNotFoundError as exc:
         raise RuntimeError(f"Template not found: {template_path}") from exc
 
+    _TEMPLATE_CACHE[cache_key] = (stat.st_mtime, stat.st_size, template)
+    _TEMPLATE_CACHE.move_to_end(cache_key)
+    if len(_TEMPLATE_CACHE) > TEMPLATE_CACHE_SIZE:
+        _TEMPLATE_CACHE.popitem(last=False)
+    return copy.deepcopy(template)
+
 
 def _build_prompt(photo_paths: List[str], template: Dict) -> str:
     template_text = template.get("text_template", "")
@@ -59,15 +92,22 @@ def _build_prompt(photo_paths: List[str], template: Dict) -> str:
 
 def _parse_ai_response(response_text: str) -> Dict:
     try:
-        return json.loads(response_text)
-    except json.JSONDecodeError as exc:
+        return json_codec.loads(response_text)
+    except json_codec.JSONDecodeError as exc:
         raise ValueError("AI response is not valid JSON") from exc
 
 
+def _is_number(value: object) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
 def _validate_ai_result(ai_result: Dict) -> List[str]:
     errors: List[str] = []
 
-    missing = REQUIRED_TOP_LEVEL_FIELDS - set(ai_result.keys())
+    if not isinstance(ai_result, dict):
+        return ["AI result must be a JSON object"]
+
+    missing = REQUIRED_TOP_LEVEL_FIELDS - ai_result.keys()
     if missing:
         errors.append(f"Missing top-level fields: {', '.join(sorted(missing))}")
         return errors
@@ -76,19 +116,25 @@ def _validate_ai_result(ai_result: Dict) -> List[str]:
     equipment = ai_result.get("equipment", {})
     avito_fields = ai_result.get("avito_fields", {})
 
+    for name, value in (("specs", specs), ("avito_fields", avito_fields)):
+        if not isinstance(value, dict):
+            errors.append(f"{name} must be an object")
+    if errors:
+        return errors
+
     mileage = specs.get("mileage_km")
-    if not isinstance(mileage, (int, float)):
+    if not _is_number(mileage):
         errors.append("specs.mileage_km must be a number")
     elif mileage > 160000:
         errors.append("specs.mileage_km must be <= 160000")
 
     payment = avito_fields.get("payment_per_month_rub")
-    if not isinstance(payment, (int, float)):
+    if not _is_number(payment):
         errors.append("avito_fields.payment_per_month_rub must be a number")
     elif not 5000 <= payment <= 25000:
         errors.append("avito_fields.payment_per_month_rub must be 5000..25000")
 
-    equipment_keys = set(equipment.keys()) if isinstance(equipment, dict) else set()
+    equipment_keys = equipment.keys() if isinstance(equipment, dict) else frozenset()
     missing_sections = REQUIRED_EQUIPMENT_SECTIONS - equipment_keys
     if missing_sections:
         errors.append(
@@ -96,12 +142,13 @@ def _validate_ai_result(ai_result: Dict) -> List[str]:
             + ", ".join(sorted(missing_sections))
         )
     else:
-        for section in REQUIRED_EQUIPMENT_SECTIONS:
-            if not isinstance(equipment.get(section), list):
+        for section in _EQUIPMENT_SECTION_ORDER:
+            # JSON arrays always decode to plain lists, so an identity check suffices.
+            if type(equipment[section]) is not list:
                 errors.append(f"equipment.{section} must be an array")
 
     transmission = specs.get("transmission")
-    if transmission not in TRANSMISSION_ALLOWED:
+    if not isinstance(transmission, str) or transmission not in TRANSMISSION_ALLOWED:
         errors.append("specs.transmission must be one of MT, AT, CVT, AMT")
 
     return errors
@@ -20,6 +20,14 @@ DEFAULT_REQUIRED_FIELDS = {
     "payment_per_month_rub",
 }
 
+# One pass over the text: 3+ line breaks collapse to a blank line, lone CR/CRLF
+# become LF, runs of horizontal whitespace (any tab, or 2+ spaces) become a space.
+_WHITESPACE_RE = re.compile(
+    r"(?P<blank_lines>(?:\r\n?|\n){3,})|\r\n?|[ \t\f\v]{2,}|[\t\f\v]"
+)
+# Text containing none of these has nothing for _WHITESPACE_RE to rewrite.
+_WHITESPACE_TRIGGERS = ("\t", "\f", "\v", "\r", "  ", "\n\n\n")
+
 
 @dataclass(frozen=True)
 class AvitoMapResult:
@@ -28,12 +36,19 @@ class AvitoMapResult:
     errors: List[str]
 
 
+def _normalize_whitespace(match: re.Match) -> str:
+    if match.lastgroup == "blank_lines":
+        return "\n\n"
+    if match.group(0)[0] == "\r":
+        return "\n"
+    return " "
+
+
 def _clean_text(text: str, *, max_length: int = 3000) -> str:
-    cleaned = text.replace("\r\n", "\n").replace("\r", "\n")
-    cleaned = re.sub(r"[\t\f\v]+", " ", cleaned)
-    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
-    cleaned = re.sub(r"[ ]{2,}", " ", cleaned)
-    cleaned = cleaned.strip()
+    if any(token in text for token in _WHITESPACE_TRIGGERS):
+        cleaned = _WHITESPACE_RE.sub(_normalize_whitespace, text).strip()
+    else:
+        cleaned = text.strip()
     if len(cleaned) > max_length:
         cleaned = cleaned[:max_length].rstrip()
     return cleaned
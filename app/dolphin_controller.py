@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
-import json
 import time
 import urllib.error
-import urllib.request
 from dataclasses import dataclass
 from typing import Dict, Optional
 
+import http_pool
+import json_codec
+
 
 @dataclass(frozen=True)
 class DolphinProfileSession:
@@ -17,25 +18,31 @@ class DolphinProfileSession:
     connection: Optional[Dict]
 
 
-def _api_request(method: str, url: str, payload: Optional[Dict] = None) -> Dict:
-    data = None
+def _api_request(
+    method: str,
+    url: str,
+    payload: Optional[Dict] = None,
+    *,
+    data: Optional[bytes] = None,
+) -> Dict:
+    """Call the Dolphin API; data is an already-encoded JSON body (skips payload)."""
     headers = {"Accept": "application/json"}
     if payload is not None:
-        data = json.dumps(payload).encode("utf-8")
+        data = json_codec.dumps(payload)
+    if data is not None:
         headers["Content-Type"] = "application/json"
 
-    request = urllib.request.Request(url, data=data, headers=headers, method=method)
     try:
-        with urllib.request.urlopen(request, timeout=30) as response:
-            body = response.read().decode("utf-8")
+        with http_pool.urlopen(method, url, body=data, headers=headers, timeout=30) as response:
+            body = response.read()
     except urllib.error.HTTPError as exc:
         raise RuntimeError(f"Dolphin API error: {exc.code} {exc.reason}") from exc
     except urllib.error.URLError as exc:
         raise RuntimeError(f"Dolphin API error: {exc.reason}") from exc
 
     try:
-        return json.loads(body) if body else {}
-    except json.JSONDecodeError as exc:
+        return json_codec.loads(body) if body else {}
+    except json_codec.JSONDecodeError as exc:
         raise RuntimeError("Dolphin API returned invalid JSON") from exc
 
 
@@ -73,7 +80,10 @@ def stop_profile(profile_id: str, *, base_url: str = "http://localhost:3001") ->
 def healthcheck(profile_id: str, *, base_url: str = "http://localhost:3001") -> bool:
     """Return True if browser is alive for the profile."""
     url = f"{base_url.rstrip('/')}/profile/healthcheck"
-    response = _api_request("POST", url, {"profile_id": profile_id})
+    return _is_alive(_api_request("POST", url, {"profile_id": profile_id}))
+
+
+def _is_alive(response: Dict) -> bool:
     return bool(response.get("alive") or response.get("status") == "ok")
 
 
@@ -83,11 +93,21 @@ def wait_for_healthcheck(
     base_url: str = "http://localhost:3001",
     timeout_s: int = 60,
     interval_s: float = 2.0,
+    initial_interval_s: float = 0.1,
+    backoff: float = 1.6,
 ) -> bool:
-    """Wait until the profile reports healthy or timeout."""
+    """Wait until the profile reports healthy or timeout.
+
+    Polls start at initial_interval_s and back off exponentially up to interval_s.
+    """
+    # Same request every poll: build the URL and encode the body once.
+    url = f"{base_url.rstrip('/')}/profile/healthcheck"
+    data = json_codec.dumps({"profile_id": profile_id})
     deadline = time.time() + timeout_s
+    delay = initial_interval_s
     while time.time() < deadline:
-        if healthcheck(profile_id, base_url=base_url):
+        if _is_alive(_api_request("POST", url, data=data)):
             return True
-        time.sleep(interval_s)
+        time.sleep(min(delay, max(deadline - time.time(), 0)))
+        delay = min(delay * backoff, interval_s)
     return False
@@ -2,13 +2,37 @@
 
 from __future__ import annotations
 
+import itertools
+import os
+import threading
 import time
-from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from typing import Callable, Dict, List, Optional
 
+import json_codec
 
-@dataclass
+
+TERMINAL_STATUSES = {"POSTED", "FAILED"}
+
+
+# (epoch second, ISO string) for the last formatted timestamp. A single tuple is
+# swapped atomically, so worker threads never see a half-updated pair.
+_timestamp_cache = (0, "")
+
+
+def _iso_now() -> str:
+    global _timestamp_cache
+    now = int(time.time())
+    cached_at, formatted = _timestamp_cache
+    if now != cached_at:
+        formatted = datetime.fromtimestamp(now, timezone.utc).isoformat(timespec="seconds")
+        _timestamp_cache = (now, formatted)
+    return formatted
+
+
+@dataclass(slots=True)
 class CarCard:
     card_id: str
     batch_id: str
@@ -19,15 +43,17 @@ class CarCard:
     ai_result: Optional[Dict] = None
     mapped_avito: Optional[Dict] = None
     post_url: Optional[str] = None
+    # Set when the poster reports POSTED, which can be well before run_once
+    # records the card in history when cards run concurrently.
+    posted_at: Optional[str] = None
     logs: List[str] = field(default_factory=list)
     errors: List[str] = field(default_factory=list)
 
     def log(self, message: str) -> None:
-        timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
-        self.logs.append(f"{timestamp} {message}")
+        self.logs.append(f"{_iso_now()} {message}")
 
 
-@dataclass
+@dataclass(slots=True)
 class NeedActionItem:
     card_id: str
     batch_id: str
@@ -35,7 +61,7 @@ class NeedActionItem:
     requires_manual_confirmation: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class PublicationRecord:
     card_id: str
     batch_id: str
@@ -44,10 +70,11 @@ class PublicationRecord:
     published_at: str
 
 
-@dataclass
+@dataclass(slots=True)
 class FlowState:
     cards: Dict[str, CarCard] = field(default_factory=dict)
-    need_action: List[NeedActionItem] = field(default_factory=list)
+    # Keyed by card_id; dicts keep insertion order, so this is still a FIFO queue.
+    need_action: Dict[str, NeedActionItem] = field(default_factory=dict)
     history: List[PublicationRecord] = field(default_factory=list)
     processed_batches: set[str] = field(default_factory=set)
 
@@ -58,27 +85,64 @@ class FlowState:
                 batch_id=card.batch_id,
                 post_url=card.post_url,
                 status=card.status,
-                published_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                published_at=card.posted_at or _iso_now(),
             )
         )
 
     def add_need_action(self, card: CarCard, reason: str) -> None:
-        self.need_action.append(
-            NeedActionItem(card_id=card.card_id, batch_id=card.batch_id, reason=reason)
+        self.need_action[card.card_id] = NeedActionItem(
+            card_id=card.card_id, batch_id=card.batch_id, reason=reason
         )
 
     def resolve_need_action(self, card_id: str) -> bool:
-        before = len(self.need_action)
-        self.need_action = [item for item in self.need_action if item.card_id != card_id]
-        return len(self.need_action) < before
+        return self.need_action.pop(card_id, None) is not None
+
+    def archive_completed(
+        self, keep: int = 1000, archive_path: str = "data/cards.ndjson"
+    ) -> int:
+        """Append all but the newest `keep` POSTED/FAILED cards to an NDJSON file.
+
+        Archived cards are dropped from `cards`; returns how many were moved.
+        """
+        # cards is in creation order, so the oldest completed cards come first.
+        completed = [
+            card_id for card_id, card in self.cards.items() if card.status in TERMINAL_STATUSES
+        ]
+        stale = completed[: max(len(completed) - keep, 0)]
+        if not stale:
+            return 0
+
+        directory = os.path.dirname(archive_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(archive_path, "ab") as handle:
+            for card_id in stale:
+                handle.write(json_codec.dumps(asdict(self.cards[card_id])) + b"\n")
+        for card_id in stale:
+            del self.cards[card_id]
+        return len(stale)
+
 
+# Process-wide sequence so IDs stay unique even across cycles in the same second.
+_id_counter = itertools.count(1)
 
-def _now_id(prefix: str, index: int) -> str:
-    return f"{prefix}_{int(time.time())}_{index}"
 
+def _now_id(prefix: str, timestamp: int) -> str:
+    return f"{prefix}_{timestamp}_{next(_id_counter)}"
 
-@dataclass
+
+@dataclass(slots=True)
 class FlowScheduler:
+    """Run new batches through the import → AI → map → post chain.
+
+    With max_workers > 1, cards run concurrently, so import_photos, ai_client
+    and mapper must be safe to call from several threads at once (each
+    import_photos call may also start its own download pool). poster is always
+    called one card at a time, because it drives the shared Dolphin browser
+    profile. With the default max_workers of 1 no pool is started and every
+    stage runs on the thread that calls run_once.
+    """
+
     interval_minutes: int
     state: FlowState
     fetch_batches: Callable[[], List[str]]
@@ -86,15 +150,39 @@ class FlowScheduler:
     ai_client: Callable[[List[str], str], Dict]
     mapper: Callable[[Dict, List[str]], Dict]
     poster: Callable[[Dict, List[str]], Dict]
+    # Cards processed concurrently; 1 runs the chain sequentially.
+    max_workers: int = 1
+    # run_forever archives old completed cards every N cycles (0 disables this).
+    archive_every_cycles: int = 10
+    archive_keep: int = 1000
+    archive_path: str = "data/cards.ndjson"
+    _post_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
 
-    def _ensure_card(self, batch_id: str, index: int) -> CarCard:
-        card_id = _now_id("card", index)
+    def _ensure_card(self, batch_id: str, timestamp: int) -> CarCard:
+        card_id = _now_id("card", timestamp)
         card = CarCard(card_id=card_id, batch_id=batch_id, status="NEW")
         self.state.cards[card_id] = card
         card.log("Card created")
         return card
 
-    def _run_chain(self, card: CarCard) -> None:
+    @staticmethod
+    def _need_action(card: CarCard, response: Dict, fallback_reason: str) -> Optional[str]:
+        """Mark card NEED_ACTION if the stage response asks for it; return the reason."""
+        if response.get("status") != "NEED_ACTION":
+            return None
+        errors = response.get("errors") or []
+        card.status = "NEED_ACTION"
+        card.errors.extend(errors)
+        return "; ".join(errors) if errors else fallback_reason
+
+    def _run_chain(self, card: CarCard) -> Optional[str]:
+        """Run the import → AI → map → post chain for one card.
+
+        Runs on a worker thread, so it only touches the card itself; the
+        NEED_ACTION reason (if any) is returned for run_once to record.
+        """
         try:
             card.log("Importing photos")
             photo_result = self.import_photos(card.batch_id)
@@ -104,54 +192,66 @@ class FlowScheduler:
 
             card.log("Running AI")
             ai_response = self.ai_client(card.photo_files, card.template_id)
-            if ai_response.get("status") == "NEED_ACTION":
-                card.status = "NEED_ACTION"
-                card.errors.extend(ai_response.get("errors", []))
-                self.state.add_need_action(card, "; ".join(ai_response.get("errors", [])) or "AI validation failed")
-                return
-
+            reason = self._need_action(card, ai_response, "AI validation failed")
+            if reason is not None:
+                return reason
             card.ai_result = ai_response.get("ai_result")
             card.status = "AI_READY"
 
             card.log("Mapping to Avito")
             mapped_response = self.mapper(card.ai_result or {}, card.photo_files)
-            if mapped_response.get("status") == "NEED_ACTION":
-                card.status = "NEED_ACTION"
-                card.errors.extend(mapped_response.get("errors", []))
-                self.state.add_need_action(card, "; ".join(mapped_response.get("errors", [])) or "Mapping failed")
-                return
-
+            reason = self._need_action(card, mapped_response, "Mapping failed")
+            if reason is not None:
+                return reason
             card.mapped_avito = mapped_response.get("mapped_avito")
             card.status = "READY_TO_POST"
 
             card.log("Posting to Avito")
-            post_response = self.poster(card.mapped_avito or {}, card.photo_files)
-            status = post_response.get("status")
+            with self._post_lock:
+                post_response = self.poster(card.mapped_avito or {}, card.photo_files)
             card.post_url = post_response.get("post_url")
-
-            if status == "POSTED":
+            reason = self._need_action(
+                card, post_response, "Captcha or manual confirmation required"
+            )
+            if reason is not None:
+                return reason
+            if post_response.get("status") == "POSTED":
                 card.status = "POSTED"
-                self.state.add_history(card)
-            elif status == "NEED_ACTION":
-                card.status = "NEED_ACTION"
-                errors = post_response.get("errors", [])
-                card.errors.extend(errors)
-                reason = "; ".join(errors) or "Captcha or manual confirmation required"
-                self.state.add_need_action(card, reason)
+                card.posted_at = _iso_now()
             else:
                 card.status = "FAILED"
                 card.errors.extend(post_response.get("errors", []))
         except Exception as exc:  # noqa: BLE001 - propagate flow errors
             card.status = "FAILED"
             card.errors.append(str(exc))
+        return None
 
     def run_once(self) -> None:
         batch_ids = self.fetch_batches()
         new_batch_ids = [batch_id for batch_id in batch_ids if batch_id not in self.state.processed_batches]
-        for index, batch_id in enumerate(new_batch_ids, start=1):
-            card = self._ensure_card(batch_id, index)
-            self._run_chain(card)
-            self.state.processed_batches.add(batch_id)
+        if not new_batch_ids:
+            return
+
+        timestamp = int(time.time())
+        cards = [self._ensure_card(batch_id, timestamp) for batch_id in new_batch_ids]
+        workers = min(self.max_workers, len(cards))
+        if workers <= 1:
+            # Sequential runs keep every stage on the calling thread, for
+            # stages (like browser automation) bound to the thread they started on.
+            for card in cards:
+                self._record(card, self._run_chain(card))
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map() yields in submission order, so state updates stay deterministic.
+            for card, reason in zip(cards, executor.map(self._run_chain, cards)):
+                self._record(card, reason)
+
+    def _record(self, card: CarCard, reason: Optional[str]) -> None:
+        if reason is not None:
+            self.state.add_need_action(card, reason)
+        elif card.status == "POSTED":
+            self.state.add_history(card)
+        self.state.processed_batches.add(card.batch_id)
 
     def run_cycles(self, cycles: int) -> None:
         for _ in range(cycles):
@@ -159,6 +259,10 @@ class FlowScheduler:
             time.sleep(self.interval_minutes * 60)
 
     def run_forever(self) -> None:
+        cycle = 0
         while True:
             self.run_once()
+            cycle += 1
+            if self.archive_every_cycles and cycle % self.archive_every_cycles == 0:
+                self.state.archive_completed(self.archive_keep, self.archive_path)
             time.sleep(self.interval_minutes * 60)
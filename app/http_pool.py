@@ -0,0 +1,165 @@
+"""Keep-alive HTTP connections shared by the API clients."""
+
+from __future__ import annotations
+
+import atexit
+import http.client
+import select
+import threading
+import urllib.error
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+
+MAX_REDIRECTS = 5
+MAX_IDLE_PER_HOST = 8
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# Safe to send again if the connection drops before the response arrives.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Idle connections by (scheme, netloc), shared by every thread. A connection is
+# checked out by one request at a time, so only these lists need the lock.
+_idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+_idle_lock = threading.Lock()
+
+
+def _is_dropped(connection: http.client.HTTPConnection) -> bool:
+    # An idle keep-alive socket only becomes readable when the server closed it.
+    sock = connection.sock
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+def _checkout(
+    key: Tuple[str, str],
+    connection_class: type,
+    timeout: float,
+) -> Tuple[http.client.HTTPConnection, bool]:
+    """Return an idle connection for key, or a new one; the flag says which."""
+    while True:
+        with _idle_lock:
+            idle = _idle.get(key)
+            connection = idle.pop() if idle else None
+        if connection is None:
+            return connection_class(key[1], timeout=timeout), False
+        if _is_dropped(connection):
+            connection.close()
+            continue
+        connection.timeout = timeout
+        connection.sock.settimeout(timeout)
+        return connection, True
+
+
+def _release(
+    key: Tuple[str, str],
+    connection: http.client.HTTPConnection,
+    response: http.client.HTTPResponse,
+) -> None:
+    # Only a fully read response leaves the connection ready for the next
+    # request; http.client also drops the socket when the server asked to close.
+    if response.isclosed() and connection.sock is not None:
+        with _idle_lock:
+            idle = _idle.setdefault(key, [])
+            if len(idle) < MAX_IDLE_PER_HOST:
+                idle.append(connection)
+                return
+    connection.close()
+
+
+def close_all() -> None:
+    """Close every idle connection."""
+    with _idle_lock:
+        connections = [connection for idle in _idle.values() for connection in idle]
+        _idle.clear()
+    for connection in connections:
+        connection.close()
+
+
+atexit.register(close_all)
+
+
+def _send(
+    method: str,
+    url: str,
+    body: Optional[bytes],
+    headers: Dict[str, str],
+    timeout: float,
+) -> Tuple[Tuple[str, str], http.client.HTTPConnection, http.client.HTTPResponse]:
+    parts = urlsplit(url)
+    if parts.scheme == "https":
+        connection_class = http.client.HTTPSConnection
+    elif parts.scheme == "http":
+        connection_class = http.client.HTTPConnection
+    else:
+        raise urllib.error.URLError(f"unsupported URL scheme: {parts.scheme!r}")
+
+    key = (parts.scheme, parts.netloc)
+    target = parts.path or "/"
+    if parts.query:
+        target = f"{target}?{parts.query}"
+
+    while True:
+        connection, reused = _checkout(key, connection_class, timeout)
+        sent = False
+        try:
+            connection.request(method, target, body=body, headers=headers)
+            sent = True
+            return key, connection, connection.getresponse()
+        except (ConnectionError, http.client.ImproperConnectionState) as exc:
+            connection.close()
+            # A reused connection can still have been closed by the server
+            # mid-check. Retry on another one, unless the request already went
+            # out and the server may have acted on it.
+            if not reused or (sent and method not in IDEMPOTENT_METHODS):
+                raise urllib.error.URLError(exc) from exc
+        except (OSError, http.client.HTTPException) as exc:
+            connection.close()
+            raise urllib.error.URLError(exc) from exc
+
+
+@contextmanager
+def urlopen(
+    method: str,
+    url: str,
+    *,
+    body: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 30,
+) -> Iterator[http.client.HTTPResponse]:
+    """Open url over a pooled keep-alive connection.
+
+    Raises urllib.error.HTTPError / URLError like urllib.request.urlopen. GET
+    redirects are followed. A response not read to the end closes its
+    connection instead of returning it to the pool.
+    """
+    headers = headers or {}
+    for _ in range(MAX_REDIRECTS + 1):
+        key, connection, response = _send(method, url, body, headers, timeout)
+        location = response.getheader("Location")
+        if method == "GET" and response.status in REDIRECT_STATUSES and location:
+            response.read()
+            _release(key, connection, response)
+            url = urljoin(url, location)
+            continue
+        if response.status >= 400:
+            response.read()
+            _release(key, connection, response)
+            raise urllib.error.HTTPError(
+                url, response.status, response.reason, response.headers, None
+            )
+        break
+    else:
+        raise urllib.error.HTTPError(
+            url, response.status, "Too many redirects", response.headers, None
+        )
+
+    try:
+        yield response
+    finally:
+        _release(key, connection, response)
@@ -0,0 +1,106 @@
+"""Smoke test for http_pool against a local keep-alive server."""
+
+from __future__ import annotations
+
+import threading
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import http_pool
+
+
+PEERS = set()
+POSTS = []
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: bytes = b"ok", location: str = "") -> None:
+        self.send_response(status)
+        if location:
+            self.send_header("Location", location)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        PEERS.add(self.client_address)
+        if self.path == "/redirect":
+            self._reply(302, b"", "/ok")
+        elif self.path == "/missing":
+            self._reply(404, b"missing")
+        elif self.path == "/close-after":
+            # Keep-alive response, then the server goes away: the pooled
+            # connection is stale by the time the client reuses it.
+            self._reply(200)
+            self.close_connection = True
+        else:
+            self._reply(200)
+
+    def do_POST(self):
+        PEERS.add(self.client_address)
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        POSTS.append(self.path)
+        if self.path == "/drop":
+            # Received, but the connection dies before the response is sent.
+            self.close_connection = True
+            return
+        self._reply(200)
+
+
+def get(url: str) -> bytes:
+    with http_pool.urlopen("GET", url) as response:
+        return response.read()
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        # Connections outlive the executors that used them.
+        for _ in range(3):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                bodies = list(executor.map(get, [f"{base}/ok"] * 20))
+            assert bodies == [b"ok"] * 20, bodies
+        assert len(PEERS) <= 4, f"Expected at most 4 connections, got {len(PEERS)}"
+
+        assert get(f"{base}/redirect") == b"ok"
+
+        try:
+            get(f"{base}/missing")
+        except urllib.error.HTTPError as exc:
+            assert exc.code == 404, exc.code
+        else:
+            raise AssertionError("Expected HTTPError for 404")
+
+        # A connection the server closed while idle is replaced, not reported.
+        get(f"{base}/close-after")
+        assert get(f"{base}/ok") == b"ok"
+
+        # A POST the server may already have handled is never sent twice.
+        POSTS.clear()
+        try:
+            with http_pool.urlopen("POST", f"{base}/drop", body=b"{}"):
+                pass
+        except urllib.error.URLError:
+            pass
+        else:
+            raise AssertionError("Expected URLError for a dropped POST")
+        assert POSTS == ["/drop"], f"Expected one POST, got {POSTS}"
+    finally:
+        http_pool.close_all()
+        server.shutdown()
+        server.server_close()
+
+    print(f"Smoke OK: 60 GETs over {len(PEERS)} connections, redirect, 404, stale reuse, no POST replay")
+
+
+if __name__ == "__main__":
+    main()
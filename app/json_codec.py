@@ -0,0 +1,27 @@
+"""JSON encoding shared by the API clients and the flow scheduler."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup; stdlib json is the fallback.
+    orjson = None
+
+# Raised by loads() on malformed input; orjson's error is a subclass of it.
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode payload as compact UTF-8 JSON, the same bytes with or without orjson."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
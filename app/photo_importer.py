@@ -2,13 +2,31 @@
 
 from __future__ import annotations
 
-import imghdr
-import json
 import os
+import shutil
 import urllib.error
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List
+from operator import itemgetter
+from typing import List, Optional, Tuple
+
+import http_pool
+import json_codec
+
+
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+IMAGE_HEADER_SIZE = 32
+
+_IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+)
 
 
 @dataclass(frozen=True)
@@ -20,24 +38,21 @@ class PhotoImportResult:
 
 
 def _api_get_json(url: str, token: str) -> dict:
-    request = urllib.request.Request(
-        url,
-        headers={
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/json",
-        },
-    )
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/json",
+    }
     try:
-        with urllib.request.urlopen(request, timeout=30) as response:
-            payload = response.read().decode("utf-8")
+        with http_pool.urlopen("GET", url, headers=headers, timeout=30) as response:
+            payload = response.read()
     except urllib.error.HTTPError as exc:
         raise RuntimeError(f"API request failed: {exc.code} {exc.reason}") from exc
     except urllib.error.URLError as exc:
         raise RuntimeError(f"API request failed: {exc.reason}") from exc
 
     try:
-        return json.loads(payload)
-    except json.JSONDecodeError as exc:
+        return json_codec.loads(payload)
+    except json_codec.JSONDecodeError as exc:
         raise RuntimeError("API returned invalid JSON") from exc
 
 
@@ -51,43 +66,69 @@ def _sorted_photos(batch: dict) -> List[dict]:
     if not isinstance(photos, list):
         raise ValueError("Batch photos must be a list")
 
+    # N unique indices that all fall in 1..N are exactly 1..N, so one pass with
+    # a seen-set covers both the uniqueness and the consecutiveness rules.
+    count = len(photos)
+    seen = set()
     for photo in photos:
         if "index" not in photo or "url" not in photo:
             raise ValueError("Each photo must include index and url")
+        index = photo["index"]
+        if index in seen:
+            raise ValueError("Photo indices must be unique")
+        if not isinstance(index, int) or not 1 <= index <= count:
+            raise ValueError("Photo indices must be consecutive starting from 1")
+        seen.add(index)
 
-    indices = [photo["index"] for photo in photos]
-    if len(indices) != len(set(indices)):
-        raise ValueError("Photo indices must be unique")
-
-    if sorted(indices) != list(range(1, len(indices) + 1)):
-        raise ValueError("Photo indices must be consecutive starting from 1")
+    return sorted(photos, key=itemgetter("index"))
 
-    return sorted(photos, key=lambda item: item["index"])
 
+def _download_file(url: str, output_path: str) -> Tuple[int, bytes]:
+    """Stream url into output_path; return (bytes written, leading header bytes).
 
-def _download_file(url: str, output_path: str) -> None:
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    The parent directory must already exist.
+    """
     try:
-        with urllib.request.urlopen(url, timeout=60) as response:
-            data = response.read()
+        with http_pool.urlopen("GET", url, timeout=60) as response:
+            with open(output_path, "wb") as file:
+                header = response.read(IMAGE_HEADER_SIZE)
+                file.write(header)
+                shutil.copyfileobj(response, file, DOWNLOAD_CHUNK_SIZE)
+                size = file.tell()
     except urllib.error.HTTPError as exc:
         raise RuntimeError(f"Failed to download photo: {exc.code} {exc.reason}") from exc
     except urllib.error.URLError as exc:
         raise RuntimeError(f"Failed to download photo: {exc.reason}") from exc
+    return size, header
+
 
-    with open(output_path, "wb") as file:
-        file.write(data)
+def _sniff_image_type(header: bytes) -> Optional[str]:
+    for magic, image_type in _IMAGE_SIGNATURES:
+        if header.startswith(magic):
+            return image_type
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
 
 
-def _validate_photo(path: str) -> None:
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Photo file missing: {path}")
-    if os.path.getsize(path) == 0:
+def _validate_photo(path: str, size: int, header: bytes) -> None:
+    if size == 0:
         raise ValueError(f"Photo file is empty: {path}")
-    if imghdr.what(path) is None:
+    if _sniff_image_type(header) is None:
         raise ValueError(f"Photo file is not a valid image: {path}")
 
 
+def _url_extension(url: str) -> str:
+    """Return the extension of the last URL path segment, like os.path.splitext."""
+    stem, dot, extension = url.rpartition("/")[2].rpartition(".")
+    return f".{extension}" if dot and stem.strip(".") else ""
+
+
+def _fetch_photo(url: str, path: str) -> None:
+    size, header = _download_file(url, path)
+    _validate_photo(path, size, header)
+
+
 def import_photos(
     batch_id: str,
     api_base_url: str,
@@ -105,18 +146,23 @@ def import_photos(
     photos = _sorted_photos(batch)
     photo_files: List[str] = []
     photo_urls: List[str] = []
+    batch_dir = os.path.join(output_dir, batch_id)
+    os.makedirs(batch_dir, exist_ok=True)
 
     for photo in photos:
         url = photo["url"]
         index = photo["index"]
-        extension = os.path.splitext(url)[1] or ".jpg"
+        extension = _url_extension(url) or ".jpg"
         filename = f"{index:02d}_{photo.get('type', 'photo')}{extension}"
-        path = os.path.join(output_dir, batch_id, filename)
-        _download_file(url, path)
-        _validate_photo(path)
-        photo_files.append(path)
+        photo_files.append(os.path.join(batch_dir, filename))
         photo_urls.append(url)
 
+    if photo_urls:
+        workers = min(DOWNLOAD_WORKERS, len(photo_urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # list() re-raises the first download/validation error, in index order.
+            list(executor.map(_fetch_photo, photo_urls, photo_files))
+
     return PhotoImportResult(
         batch_id=batch_id,
         status="PHOTOS_READY",
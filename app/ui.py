@@ -2,15 +2,40 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from datetime import datetime
+import functools
+import hashlib
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
 from html import escape
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import Dict, List, Optional
-from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import MappingProxyType
+from typing import Callable, Deque, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import quote, unquote, unquote_plus
 
 
-@dataclass
+LOG_LIMIT = 200
+# The panel's POSTs carry no payload; anything larger is refused unread.
+MAX_POST_BODY = 64 * 1024
+
+# Per-second timestamp cache, as in flow_scheduler._iso_now (which explains
+# the single tuple); the panel keeps its own for the "Z"-suffixed format.
+_timestamp_cache = (0, "")
+
+
+def _iso_now() -> str:
+    global _timestamp_cache
+    now = int(time.time())
+    cached_at, formatted = _timestamp_cache
+    if now != cached_at:
+        formatted = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+        _timestamp_cache = (now, formatted)
+    return formatted
+
+
+@dataclass(slots=True)
 class CarCard:
     card_id: str
     status: str
@@ -18,100 +43,179 @@ class CarCard:
     ai_result: Optional[Dict] = None
     mapped_avito: Optional[Dict] = None
     post_url: Optional[str] = None
-    logs: List[str] = field(default_factory=list)
+    # Only the newest LOG_LIMIT lines are kept (and rendered).
+    logs: Deque[str] = field(default_factory=lambda: deque(maxlen=LOG_LIMIT))
     needs_action: bool = False
+    # HTML-escaped copies of the rendered text fields; None until next render.
+    _escaped: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+    # card_id never changes, so its escaped forms (as text and as a URL path
+    # segment) are computed once.
+    _escaped_id: str = field(default="", init=False, repr=False, compare=False)
+    _escaped_path: str = field(default="", init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._escaped_id = escape(self.card_id)
+        self._escaped_path = escape(quote(self.card_id, safe=""))
 
     def log(self, message: str) -> None:
-        timestamp = datetime.utcnow().isoformat(timespec="seconds") + "Z"
-        self.logs.append(f"{timestamp}: {message}")
-
-
-CARDS: Dict[str, CarCard] = {
-    "cc_demo": CarCard(
-        card_id="cc_demo",
-        status="NEW",
-        photo_urls=[],
-        ai_result=None,
-        mapped_avito=None,
-        post_url=None,
-        logs=["Demo card created"],
-        needs_action=False,
+        self.logs.append(f"{_iso_now()}: {message}")
+        self._escaped = None
+
+    def escaped(self) -> Dict:
+        """Escaped card_id/status/logs, computed once per change."""
+        if self._escaped is None:
+            self._escaped = {
+                "card_id": self._escaped_id,
+                "status": _STATUS_MARKUP.get(self.status) or escape(self.status),
+                "logs": [escape(line) for line in self.logs],
+            }
+        return self._escaped
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class _Snapshot:
+    """A published card set; hashed by identity so it can key the page cache."""
+
+    cards: Mapping[str, CarCard]
+
+
+# Read-copy-update: writers copy the card they change and publish a new
+# snapshot, so the mapping and the cards' fields are never changed once
+# published, and GET handlers render whichever snapshot they pick up without
+# taking _LOCK. The one write on a published card is escaped() filling its
+# cache from a GET thread: racing readers compute identical values, so it
+# needs no lock either.
+_CARDS_SNAPSHOT = _Snapshot(
+    MappingProxyType(
+        {
+            "cc_demo": CarCard(
+                card_id="cc_demo",
+                status="NEW",
+                photo_urls=[],
+                ai_result=None,
+                mapped_avito=None,
+                post_url=None,
+                logs=deque(["Demo card created"], maxlen=LOG_LIMIT),
+                needs_action=False,
+            )
+        }
     )
+)
+
+
+# The only query parameter the panel reads; first occurrence wins, like parse_qs.
+_CARD_PARAM_RE = re.compile(r"(?:^|&)card=([^&]+)")
+# POST routes: /action/<card_id>[/<action>] and /reset/<card_id>. Without the
+# path segment the action is the form body's act field.
+_ACTION_ROUTE = re.compile(r"/action/([^/]+)(?:/([^/]+))?/?")
+_ACT_PARAM_RE = re.compile(r"(?:^|&)act=([^&]*)")
+_RESET_ROUTE = re.compile(r"/reset/([^/]+)/?")
+
+# Serialises writers; readers never take it.
+_LOCK = threading.RLock()
+
+
+def _copy_card(card: CarCard) -> CarCard:
+    # logs is the only field changed in place; the handlers assign new values
+    # to the rest.
+    return replace(card, logs=deque(card.logs, maxlen=LOG_LIMIT))
+
+
+def _store(card: CarCard) -> None:
+    """Publish a snapshot with card under its id (call with _LOCK held)."""
+    global _CARDS_SNAPSHOT
+    cards = dict(_CARDS_SNAPSHOT.cards)
+    cards[card.card_id] = card
+    _CARDS_SNAPSHOT = _Snapshot(MappingProxyType(cards))
+
+
+def current_cards() -> Mapping[str, CarCard]:
+    """Read-only mapping of the cards as last published.
+
+    The mapping never changes; call again to see later updates. Change cards
+    through add_card, never by mutating the ones returned here.
+    """
+    return _CARDS_SNAPSHOT.cards
+
+
+def add_card(card: CarCard) -> None:
+    """Add card to the panel, replacing any card with the same card_id."""
+    # Copied so that later changes to the caller's object stay unpublished.
+    with _LOCK:
+        _store(_copy_card(card))
+
+
+def _update_card(card_id: str, change: Callable[[CarCard], None]) -> bool:
+    """Apply change to a copy of the card and publish it; False if there is no such card."""
+    with _LOCK:
+        card = _CARDS_SNAPSHOT.cards.get(card_id)
+        if card is None:
+            return False
+        updated = _copy_card(card)
+        change(updated)
+        _store(updated)
+    return True
+
+
+# Card-row HTML split around the interpolated (escaped) card_id/status, so a
+# row is assembled by extending one parts list with constants and fields.
+_ROW_ID = "<div class=\"card-item\"><div><strong>"
+_ROW_STATUS = "</strong></div><div class=\"status\">Статус: "
+_ROW_STATUS_END = "</div>"
+# Each row's actions are one form posting act=<name> to /action/<card_id>;
+# Open resubmits the same form as GET /?card=<card_id>. Without JS the forms
+# work as they are; the page script turns them into fetch calls.
+_ROW_ACTIONS = "<form class=\"actions\" method=\"post\" action=\"/action/"
+_ROW_DATA_ID = "\" data-id=\""
+_ROW_OPEN = "\"><button formmethod=\"get\" formaction=\"/\" name=\"card\" value=\""
+_ROW_BUTTONS = (
+    "\">Открыть</button>"
+    "<button name=\"act\" value=\"download\">Скачать фото</button>"
+    "<button name=\"act\" value=\"ai\">AI</button>"
+    "<button name=\"act\" value=\"publish\">Публиковать</button>"
+    "</form>"
+    "</div>"
+)
+_NEED_ACTION_BADGE = '<div class="need-action">Нужно действие</div>'
+
+# Card statuses from docs/data-model.md.
+STATUSES = (
+    "NEW",
+    "PHOTOS_READY",
+    "AI_READY",
+    "READY_TO_POST",
+    "POSTED",
+    "NEED_ACTION",
+    "FAILED",
+)
+
+# Escaped form of each known status, so only unexpected ones go through escape().
+_STATUS_MARKUP: Dict[str, str] = {status: escape(status) for status in STATUSES}
+
+
+def _row_middle(escaped_status: str, needs_action: bool) -> str:
+    """Row HTML from the status label up to the card_id in the actions form URL."""
+    badge = _NEED_ACTION_BADGE if needs_action else ""
+    return f"{_ROW_STATUS}{escaped_status}{_ROW_STATUS_END}{badge}{_ROW_ACTIONS}"
+
+
+# Everything in a row that depends only on (status, needs_action), prebuilt so
+# rendering a row is a dict lookup instead of branching and concatenation.
+_ROW_MIDDLES: Dict[Tuple[str, bool], str] = {
+    (status, needs_action): _row_middle(markup, needs_action)
+    for status, markup in _STATUS_MARKUP.items()
+    for needs_action in (False, True)
 }
 
-
-def _render_index(selected_id: str) -> str:
-    selected = CARDS.get(selected_id)
-
-    def card_row(card: CarCard) -> str:
-        need_action = (
-            '<div class="need-action">Нужно действие</div>' if card.needs_action else ""
-        )
-        return (
-            "<div class=\"card-item\">"
-            f"<div><strong>{escape(card.card_id)}</strong></div>"
-            f"<div class=\"status\">Статус: {escape(card.status)}</div>"
-            f"{need_action}"
-            "<div class=\"actions\">"
-            f"<form method=\"get\" action=\"/\">"
-            f"<input type=\"hidden\" name=\"card\" value=\"{escape(card.card_id)}\" />"
-            "<button type=\"submit\">Открыть</button>"
-            "</form>"
-            f"<form method=\"post\" action=\"/action/{escape(card.card_id)}/download\">"
-            "<button type=\"submit\">Скачать фото</button>"
-            "</form>"
-            f"<form method=\"post\" action=\"/action/{escape(card.card_id)}/ai\">"
-            "<button type=\"submit\">AI</button>"
-            "</form>"
-            f"<form method=\"post\" action=\"/action/{escape(card.card_id)}/publish\">"
-            "<button type=\"submit\">Публиковать</button>"
-            "</form>"
-            "</div>"
-            "</div>"
-        )
-
-    cards_html = "".join(card_row(card) for card in CARDS.values())
-    detail_html = "<p>Выберите карточку в очереди.</p>"
-
-    if selected:
-        photos = (
-            "<ul>"
-            + "".join(f"<li>{escape(url)}</li>" for url in selected.photo_urls)
-            + "</ul>"
-            if selected.photo_urls
-            else "<p>Фото пока нет.</p>"
-        )
-        ai_result = (
-            f"<pre>{escape(str(selected.ai_result))}</pre>"
-            if selected.ai_result
-            else "<p>ИИ ещё не запускался.</p>"
-        )
-        preview = (
-            f"<p><strong>{escape(selected.ai_result.get('title', ''))}</strong></p>"
-            f"<p>{escape(selected.ai_result.get('description', ''))}</p>"
-            if selected.ai_result
-            else "<p>Пока нет текста.</p>"
-        )
-        logs = "".join(f"<div>{escape(line)}</div>" for line in selected.logs)
-        post_url = (
-            f"<p><strong>Ссылка:</strong> <a href=\"{escape(selected.post_url)}\">"
-            f"{escape(selected.post_url)}</a></p>"
-            if selected.post_url
-            else ""
-        )
-        detail_html = f"""
+_DETAIL_TEMPLATE = """
         <div class="section">
-          <h2>Карточка машины: {escape(selected.card_id)}</h2>
-          <p><span class="status">Статус:</span> {escape(selected.status)}</p>
+          <h2>Карточка машины: {card_id}</h2>
+          <p><span class="status">Статус:</span> {status}</p>
           {post_url}
-          <div class="actions">
-            <form method="post" action="/action/{escape(selected.card_id)}/need_action">
-              <button type="submit">Нужно действие</button>
-            </form>
-            <form method="post" action="/reset/{escape(selected.card_id)}">
-              <button type="submit">Сбросить</button>
-            </form>
-          </div>
+          <form class="actions" method="post" action="/action/{card_path}" data-id="{card_id}">
+            <button name="act" value="need_action">Нужно действие</button>
+            <button formaction="/reset/{card_path}">Сбросить</button>
+          </form>
         </div>
 
         <div class="section">
@@ -135,25 +239,33 @@ def _render_index(selected_id: str) -> str:
         </div>
         """
 
-    return f"""
+# Served once per browser from /style.css. The href carries a digest of the
+# rules, so the year-long immutable caching is dropped as soon as they change.
+_CSS = b"""\
+body { font-family: Arial, sans-serif; margin: 20px; }
+.layout { display: grid; grid-template-columns: 280px 1fr; gap: 24px; }
+.card-list { border: 1px solid #ddd; padding: 12px; }
+.card-item { padding: 8px; border-bottom: 1px solid #eee; }
+.card-item:last-child { border-bottom: none; }
+.status { font-weight: bold; }
+.actions { display: flex; gap: 8px; flex-wrap: wrap; margin-top: 12px; }
+button { padding: 6px 10px; }
+.section { border: 1px solid #ddd; padding: 12px; margin-bottom: 16px; }
+.log { background: #f7f7f7; padding: 8px; border-radius: 4px; }
+.need-action { color: #b00020; font-weight: bold; }
+"""
+_CSS_VERSION = hashlib.sha1(_CSS).hexdigest()[:12]
+_CSS_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Static page scaffolding, encoded once. Only the card list and the detail
+# pane between _HEAD and _TAIL are rendered per request.
+_HEAD = """
 <!doctype html>
 <html lang="ru">
 <head>
   <meta charset="utf-8" />
   <title>Mini Control Panel</title>
-  <style>
-    body {{ font-family: Arial, sans-serif; margin: 20px; }}
-    .layout {{ display: grid; grid-template-columns: 280px 1fr; gap: 24px; }}
-    .card-list {{ border: 1px solid #ddd; padding: 12px; }}
-    .card-item {{ padding: 8px; border-bottom: 1px solid #eee; }}
-    .card-item:last-child {{ border-bottom: none; }}
-    .status {{ font-weight: bold; }}
-    .actions {{ display: flex; gap: 8px; flex-wrap: wrap; margin-top: 12px; }}
-    button {{ padding: 6px 10px; }}
-    .section {{ border: 1px solid #ddd; padding: 12px; margin-bottom: 16px; }}
-    .log {{ background: #f7f7f7; padding: 8px; border-radius: 4px; }}
-    .need-action {{ color: #b00020; font-weight: bold; }}
-  </style>
+  <link rel="stylesheet" href="/style.css?v={version}" />
 </head>
 <body>
   <h1>Мини-панель управления</h1>
@@ -161,94 +273,266 @@ def _render_index(selected_id: str) -> str:
   <div class="layout">
     <div class="card-list">
       <h2>Очередь карточек</h2>
-      {cards_html}
+      """.replace("{version}", _CSS_VERSION).encode("utf-8")
+_MID = """
     </div>
 
     <div>
-      {detail_html}
+      """
+_TAIL = """
     </div>
   </div>
+  <script>
+    // Post action forms with fetch: the server answers 204 instead of a
+    // redirect, so the page is loaded once, by navigating to the card.
+    document.addEventListener("submit", (event) => {
+      const button = event.submitter;
+      if (!button || button.formMethod === "get") return;
+      event.preventDefault();
+      const body = new URLSearchParams();
+      if (button.name) body.set(button.name, button.value);
+      fetch(button.formAction, {
+        method: "POST",
+        body,
+        headers: { "X-Requested-With": "fetch" },
+      })
+        .then((response) => {
+          if (!response.ok) throw new Error(response.status + " " + response.statusText);
+          location.href = "/?card=" + encodeURIComponent(event.target.dataset.id);
+        })
+        .catch((error) => alert("Действие не выполнено: " + error.message));
+    });
+  </script>
 </body>
 </html>
-"""
+""".encode("utf-8")
+_STATIC_LENGTH = len(_HEAD) + len(_TAIL)
+
+
+@functools.lru_cache(maxsize=256)
+def _preview_html(title: str, description: str) -> str:
+    return f"<p><strong>{escape(title)}</strong></p><p>{escape(description)}</p>"
+
+
+@functools.lru_cache(maxsize=256)
+def _post_link_html(post_url: str) -> str:
+    url = escape(post_url)
+    return f"<p><strong>Ссылка:</strong> <a href=\"{url}\">{url}</a></p>"
+
+
+def _render_detail(selected: CarCard) -> str:
+    photos = (
+        "<ul>"
+        + "".join(f"<li>{escape(url)}</li>" for url in selected.photo_urls)
+        + "</ul>"
+        if selected.photo_urls
+        else "<p>Фото пока нет.</p>"
+    )
+    ai_result = (
+        f"<pre>{escape(str(selected.ai_result))}</pre>"
+        if selected.ai_result
+        else "<p>ИИ ещё не запускался.</p>"
+    )
+    preview = (
+        _preview_html(
+            selected.ai_result.get("title", ""), selected.ai_result.get("description", "")
+        )
+        if selected.ai_result
+        else "<p>Пока нет текста.</p>"
+    )
+    escaped = selected.escaped()
+    logs = "".join(f"<div>{line}</div>" for line in escaped["logs"])
+    post_url = _post_link_html(selected.post_url) if selected.post_url else ""
+    return _DETAIL_TEMPLATE.format(
+        card_id=escaped["card_id"],
+        card_path=selected._escaped_path,
+        status=escaped["status"],
+        post_url=post_url,
+        photos=photos,
+        ai_result=ai_result,
+        preview=preview,
+        logs=logs,
+    )
+
+
+def _render_index(selected_id: str, cards: Mapping[str, CarCard]) -> str:
+    """Render the dynamic part of the page that sits between _HEAD and _TAIL."""
+    parts: List[str] = []
+    for card in cards.values():
+        card_id = card._escaped_id
+        middle = _ROW_MIDDLES.get((card.status, card.needs_action))
+        if middle is None:
+            middle = _row_middle(card.escaped()["status"], card.needs_action)
+        parts.extend(
+            (
+                _ROW_ID, card_id,
+                middle, card._escaped_path,
+                _ROW_DATA_ID, card_id,
+                _ROW_OPEN, card_id,
+                _ROW_BUTTONS,
+            )
+        )
+
+    selected = cards.get(selected_id)
+    parts.append(_MID)
+    parts.append(_render_detail(selected) if selected else "<p>Выберите карточку в очереди.</p>")
+    return "".join(parts)
+
+
+@functools.lru_cache(maxsize=64)
+def _render_page(selected_id: str, snapshot: _Snapshot) -> Tuple[bytes, str]:
+    """Encoded dynamic section and the full Content-Length for one snapshot."""
+    encoded = _render_index(selected_id, snapshot.cards).encode("utf-8")
+    return encoded, str(_STATIC_LENGTH + len(encoded))
+
+
+def _download_photos(card: CarCard) -> None:
+    card.status = "PHOTOS_READY"
+    card.photo_urls = ["https://photo-site.example.com/demo/01.jpg"]
+    card.log("Photos downloaded")
+
+
+def _run_ai(card: CarCard) -> None:
+    card.status = "AI_READY"
+    card.ai_result = {
+        "title": "Demo car",
+        "description": "Demo description",
+    }
+    card.log("AI result generated")
+
+
+def _publish(card: CarCard) -> None:
+    card.status = "POSTED"
+    card.post_url = "https://avito.example.com/item/demo"
+    card.log("Listing published")
+
+
+def _mark_need_action(card: CarCard) -> None:
+    card.status = "NEED_ACTION"
+    card.needs_action = True
+    card.log("Manual action required")
+
+
+def _reset_card(card: CarCard) -> None:
+    card.status = "NEW"
+    card.photo_urls = []
+    card.ai_result = None
+    card.mapped_avito = None
+    card.post_url = None
+    card.needs_action = False
+    card.logs = deque(["Reset card"], maxlen=LOG_LIMIT)
+
+
+def _log_unknown_action(action: str, card: CarCard) -> None:
+    card.log(f"Unknown action: {action}")
+
+
+# POST /action/<card_id>/<name> handlers.
+_ACTIONS: Dict[str, Callable[[CarCard], None]] = {
+    "download": _download_photos,
+    "ai": _run_ai,
+    "publish": _publish,
+    "need_action": _mark_need_action,
+}
 
 
 class ControlPanelHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps the browser's connection open between clicks; every
+    # response must therefore carry a Content-Length.
+    protocol_version = "HTTP/1.1"
+    # Responses are small and written in pieces (status line and headers, then
+    # page head, body and tail). Buffer them so handle_one_request's flush
+    # sends each response in one go, and set TCP_NODELAY so that send is not
+    # held back by Nagle waiting on the client's delayed ACK.
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
     def _redirect(self, location: str) -> None:
         self.send_response(303)
         self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
         self.end_headers()
 
+    def _action_done(self, card_id: str, found: bool) -> None:
+        if self.headers.get("X-Requested-With") == "fetch":
+            # The page script navigates by itself, so skip the redirect (and
+            # the page render a followed redirect would cost).
+            self.send_response(204 if found else 404)
+            if not found:
+                self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._redirect(f"/?card={quote(card_id, safe='')}" if found else "/")
+
+    def _read_body(self) -> Optional[bytes]:
+        """Read the request body; None (after an error response) if it cannot be."""
+        # Unread body bytes would be parsed as the next request on this connection.
+        value = (self.headers.get("Content-Length") or "0").strip()
+        length = int(value) if value.isascii() and value.isdigit() else -1
+        if length < 0:
+            self.close_connection = True
+            self.send_error(400, "Invalid Content-Length")
+            return None
+        if length > MAX_POST_BODY:
+            self.close_connection = True
+            self.send_error(413)
+            return None
+        return self.rfile.read(length) if length else b""
+
+    def _send_stylesheet(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/css; charset=utf-8")
+        self.send_header("Content-Length", str(len(_CSS)))
+        self.send_header("Cache-Control", _CSS_CACHE_CONTROL)
+        self.end_headers()
+        self.wfile.write(_CSS)
+
     def do_GET(self) -> None:  # noqa: N802
-        parsed = urlparse(self.path)
-        params = parse_qs(parsed.query)
-        selected = params.get("card", ["cc_demo"])[0]
-        body = _render_index(selected)
-        encoded = body.encode("utf-8")
+        if self.path.partition("?")[0] == "/style.css":
+            self._send_stylesheet()
+            return
+        match = _CARD_PARAM_RE.search(self.path.partition("?")[2])
+        selected = unquote_plus(match.group(1)) if match else "cc_demo"
+        encoded, content_length = _render_page(selected, _CARDS_SNAPSHOT)
         self.send_response(200)
         self.send_header("Content-Type", "text/html; charset=utf-8")
-        self.send_header("Content-Length", str(len(encoded)))
+        self.send_header("Content-Length", content_length)
         self.end_headers()
+        self.wfile.write(_HEAD)
         self.wfile.write(encoded)
+        self.wfile.write(_TAIL)
 
     def do_POST(self) -> None:  # noqa: N802
-        parsed = urlparse(self.path)
-        parts = [part for part in parsed.path.split("/") if part]
-        if not parts:
-            self._redirect("/")
+        body = self._read_body()
+        if body is None:
             return
-
-        if parts[0] == "action" and len(parts) == 3:
-            _, card_id, action = parts
-            card = CARDS.get(card_id)
-            if card is None:
-                self._redirect("/")
-                return
-
-            if action == "download":
-                card.status = "PHOTOS_READY"
-                card.photo_urls = ["https://photo-site.example.com/demo/01.jpg"]
-                card.log("Photos downloaded")
-            elif action == "ai":
-                card.status = "AI_READY"
-                card.ai_result = {
-                    "title": "Demo car",
-                    "description": "Demo description",
-                }
-                card.log("AI result generated")
-            elif action == "publish":
-                card.status = "POSTED"
-                card.post_url = "https://avito.example.com/item/demo"
-                card.log("Listing published")
-            elif action == "need_action":
-                card.status = "NEED_ACTION"
-                card.needs_action = True
-                card.log("Manual action required")
-            else:
-                card.log(f"Unknown action: {action}")
-
-            self._redirect(f"/?card={card_id}")
+        path = self.path.partition("?")[0]
+
+        match = _ACTION_ROUTE.fullmatch(path)
+        if match:
+            card_id, action = match.groups()
+            card_id = unquote(card_id)
+            if action is None:
+                param = _ACT_PARAM_RE.search(body.decode("latin-1"))
+                action = unquote_plus(param.group(1)) if param else ""
+            handler = _ACTIONS.get(action)
+            if handler is None:
+                handler = functools.partial(_log_unknown_action, action)
+            self._action_done(card_id, _update_card(card_id, handler))
             return
 
-        if parts[0] == "reset" and len(parts) == 2:
-            _, card_id = parts
-            card = CARDS.get(card_id)
-            if card:
-                card.status = "NEW"
-                card.photo_urls = []
-                card.ai_result = None
-                card.mapped_avito = None
-                card.post_url = None
-                card.needs_action = False
-                card.logs = ["Reset card"]
-            self._redirect(f"/?card={card_id}")
+        match = _RESET_ROUTE.fullmatch(path)
+        if match:
+            card_id = unquote(match.group(1))
+            self._action_done(card_id, _update_card(card_id, _reset_card))
             return
 
         self._redirect("/")
 
 
 def run_server(host: str = "0.0.0.0", port: int = 8000) -> None:
-    server = HTTPServer((host, port), ControlPanelHandler)
+    # Threaded so one idle keep-alive connection cannot block other clients.
+    server = ThreadingHTTPServer((host, port), ControlPanelHandler)
     print(f"Control panel running at http://{host}:{port}")
     server.serve_forever()
 